@@ -5,8 +5,11 @@ Based on PrimeBDS's database implementation.
 
 import sqlite3
 import threading
+import time
 import json
 import os
+import queue
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
@@ -17,6 +20,135 @@ from endstone import Player
 DB_FOLDER = Path("plugins/inventory_manager_data")
 DB_FOLDER.mkdir(parents=True, exist_ok=True)
 
+# Number of read-only connections kept open alongside the writer
+READ_POOL_SIZE = 4
+
+# Seconds between background writes of staged inventory saves
+FLUSH_INTERVAL = 0.2
+
+# Longest wait between retries while staged saves keep failing to write
+FLUSH_RETRY_MAX = 30.0
+
+# Seconds between idle WAL truncations, run from the flush thread
+CHECKPOINT_INTERVAL = 60 * 5
+
+# Per-connection prepared statement cache (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Hot-path SQL, defined once so every call reuses the connection's cached prepared statement
+_UPSERT_SET = (
+    "name = excluded.name, type = excluded.type, amount = excluded.amount, damage = excluded.damage, "
+    "display_name = excluded.display_name, enchants = excluded.enchants, lore = excluded.lore, "
+    "unbreakable = excluded.unbreakable, data = excluded.data "
+    "WHERE (name, type, amount, damage, display_name, enchants, lore, unbreakable, data) IS NOT "
+    "(excluded.name, excluded.type, excluded.amount, excluded.damage, excluded.display_name, "
+    "excluded.enchants, excluded.lore, excluded.unbreakable, excluded.data)"
+)
+_SQL_SAVE_USER = "INSERT OR REPLACE INTO users (xuid, name, name_lc, last_join) VALUES (?, ?, ?, ?)"
+_SQL_UPDATE_LEAVE = "UPDATE users SET last_leave = ? WHERE xuid = ?"
+_SQL_USER_BY_PREFIX = (
+    "SELECT xuid, name, last_join, last_leave FROM users "
+    "WHERE name_lc >= ? AND name_lc < ? ORDER BY last_join DESC LIMIT 1"
+)
+_SQL_USER_BY_SUBSTRING = (
+    "SELECT xuid, name, last_join, last_leave FROM users "
+    "WHERE instr(name_lc, ?) > 0 ORDER BY last_join DESC LIMIT 1"
+)
+_SQL_SEARCH_USERS = (
+    "SELECT xuid, name, last_join, last_leave FROM users "
+    "WHERE instr(name_lc, ?) > 0 ORDER BY last_join DESC"
+)
+_SQL_UPSERT_INV = (
+    "INSERT INTO inventories "
+    "(xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(xuid, slot_type, slot) DO UPDATE SET " + _UPSERT_SET
+)
+_SQL_DELETE_INV = "DELETE FROM inventories WHERE xuid = ?"
+_SQL_SELECT_INV = (
+    "SELECT xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data "
+    "FROM inventories WHERE xuid = ?"
+)
+_SQL_UPSERT_EC = (
+    "INSERT INTO ender_chests "
+    "(xuid, name, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(xuid, slot) DO UPDATE SET " + _UPSERT_SET
+)
+_SQL_DELETE_EC = "DELETE FROM ender_chests WHERE xuid = ?"
+_SQL_SELECT_EC = (
+    "SELECT xuid, name, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data "
+    "FROM ender_chests WHERE xuid = ?"
+)
+
+
+AIR = "minecraft:air"
+
+# Compact encoder shared by every save; empty enchants/lore skip encoding entirely
+_JSON_ENCODE = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+_EMPTY_DICT_JSON = "{}"
+_EMPTY_LIST_JSON = "[]"
+
+
+def _stored_type(item) -> Optional[str]:
+    """Get the item's type id, or None for empty/air slots that are not stored"""
+    if not item:
+        return None
+    item_type = str(item.type)
+    return None if item_type == AIR else item_type
+
+
+def _item_columns(item, item_type: str) -> tuple:
+    """Build the (type, amount, damage, display_name, enchants, lore, unbreakable, data) columns for an item
+
+    enchants and lore are left as Python objects; _encode_row serializes them at write time.
+    """
+    # Extract item metadata - one lookup per field, meta may lack any of them
+    meta = getattr(item, "item_meta", None)
+    if meta:
+        display_name = getattr(meta, "display_name", "")
+        enchants = getattr(meta, "enchants", None)
+        lore = getattr(meta, "lore", None)
+        unbreakable = bool(getattr(meta, "is_unbreakable", False))
+        damage = getattr(meta, "damage", 0)
+    else:
+        display_name = ""
+        enchants = lore = None
+        unbreakable = False
+        damage = 0
+
+    return (
+        item_type,
+        item.amount,
+        damage,
+        display_name,
+        dict(enchants) if enchants else None,
+        list(lore) if lore else None,
+        unbreakable,  # bool is an int subclass, sqlite3 stores it as 0/1
+        getattr(item, "data", None)
+    )
+
+
+def _encode_row(row: tuple, enchants_index: int) -> tuple:
+    """Serialize the enchants and lore columns (stored side by side) of a staged row"""
+    enchants, lore = row[enchants_index], row[enchants_index + 1]
+    return row[:enchants_index] + (
+        _JSON_ENCODE(enchants) if enchants else _EMPTY_DICT_JSON,
+        _JSON_ENCODE(lore) if lore else _EMPTY_LIST_JSON,
+    ) + row[enchants_index + 2:]
+
+
+def _parse_json(text: Optional[str], empty: type):
+    """Decode a stored enchants/lore column, falling back to an empty container"""
+    # Probe the first character so "null", "0" and other junk never reach the parser
+    if not text or text[0] not in "{[":
+        return empty()
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError:
+        return empty()
+    return value if isinstance(value, empty) else empty()
+
 
 @dataclass
 class User:
@@ -52,39 +184,191 @@ class DatabaseManager:
     def __init__(self, db_name: str):
         """Initialize database connection"""
         self.db_path = DB_FOLDER / (db_name if db_name.endswith('.db') else db_name + '.db')
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db_path_str = os.fspath(self.db_path)
+        self.conn = self._connect()
+        # Autocommit mode - multi-statement writes open their own transaction
+        self.conn.isolation_level = None
+        # time.monotonic() of the last committed write, used to find idle moments
+        self.last_write = 0.0
+
+        # Pre-opened read-only connections, shared between threads
+        self._read_pool = queue.Queue(maxsize=READ_POOL_SIZE)
+        for _ in range(READ_POOL_SIZE):
+            read_conn = self._connect()
+            read_conn.execute("PRAGMA query_only=ON;")
+            read_conn.row_factory = sqlite3.Row
+            self._read_pool.put(read_conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the plugin's PRAGMA settings applied"""
+        conn = sqlite3.connect(
+            self._db_path_str, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
         # Enable WAL mode for better concurrency
-        self.conn.execute("PRAGMA journal_mode=WAL;")
-        self.cursor = self.conn.cursor()
-
-    def execute(self, query: str, params: tuple = (), readonly: bool = False) -> sqlite3.Cursor:
-        """Execute a database query with thread safety"""
+        conn.execute("PRAGMA journal_mode=WAL;")
+        # WAL only needs to sync on checkpoint, so NORMAL is still crash-safe
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        conn.execute("PRAGMA cache_size=-20000;")  # ~20 MB page cache
+        conn.execute("PRAGMA mmap_size=134217728;")  # 128 MB
+        conn.execute("PRAGMA busy_timeout=5000;")
+        # Smaller, more frequent automatic checkpoints (default is 1000 pages)
+        conn.execute("PRAGMA wal_autocheckpoint=200;")
+        return conn
+
+    @contextmanager
+    def _read_connection(self):
+        """Borrow a connection from the read pool for the duration of the block"""
+        conn = self._read_pool.get()
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+
+    def execute(self, query: str, params: tuple = (), readonly: bool = False):
+        """Execute a database query with thread safety
+
+        Read-only queries run on a pooled connection and return the fetched rows,
+        write queries return a fresh cursor on the write connection.
+        """
         if readonly:
-            # For read-only queries, use a separate connection
-            read_conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-            cursor = read_conn.cursor()
-            cursor.execute(query, params)
-            return cursor
+            with self._read_connection() as read_conn:
+                return read_conn.execute(query, params).fetchall()
         else:
             # For write queries, use lock
             with self._lock:
-                self.cursor.execute(query, params)
-                if not query.strip().upper().startswith("SELECT"):
-                    self.conn.commit()
-                return self.cursor
+                cursor = self.conn.execute(query, params)
+                self.last_write = time.monotonic()
+                return cursor
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in one write transaction (caller holds _lock)"""
+        cursor = self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+            self.conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT can leave the transaction open - never leave it dangling
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+        self.last_write = time.monotonic()
+
+    def checkpoint(self, idle_seconds: float = 1.0) -> bool:
+        """Fold the WAL back into the database and truncate it, unless a write happened recently
+
+        Returns True if the checkpoint ran.
+        """
+        if time.monotonic() - self.last_write < idle_seconds:
+            return False
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+        return True
 
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        while not self._read_pool.empty():
+            self._read_pool.get_nowait().close()
         self.conn.close()
 
 
 class InventoryDB(DatabaseManager):
     """Database for storing player inventory and ender chest data"""
 
-    def __init__(self, db_name: str = "inventories.db"):
+    def __init__(self, db_name: str = "inventories.db", logger=None):
         """Initialize inventory database"""
         super().__init__(db_name)
         self.create_tables()
+        # Where background flush failures are reported (falls back to print)
+        self.logger = logger
+
+        # Staged rows per xuid, written by a background thread so repeated saves coalesce
+        self._pending_inv: Dict[str, List[tuple]] = {}
+        self._pending_ec: Dict[str, List[tuple]] = {}
+        self._pending_lock = threading.Lock()
+        # Held for a whole flush, and by reads so they never see a half-finished one
+        self._flush_lock = threading.RLock()
+        self._stop_flushing = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop, name="InventoryDB-flush", daemon=True
+        )
+        self._flush_thread.start()
+
+    def _flush_loop(self):
+        """Background thread - write staged saves every FLUSH_INTERVAL seconds, checkpoint when idle"""
+        next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL
+        delay = FLUSH_INTERVAL
+        last_error = None
+        while not self._stop_flushing.wait(delay):
+            try:
+                self.flush()
+            except Exception as e:
+                # The failed rows are staged again - retry less often, and only log a new error
+                delay = min(delay * 2, FLUSH_RETRY_MAX)
+                if str(e) != last_error:
+                    last_error = str(e)
+                    self._log("error", f"Failed to flush staged saves: {e}")
+            else:
+                if last_error is not None:
+                    self._log("info", "Staged saves are being written again")
+                    last_error = None
+                delay = FLUSH_INTERVAL
+
+            # Truncate the WAL here rather than on the server thread; retried each pass until idle
+            if time.monotonic() >= next_checkpoint:
+                try:
+                    if self.checkpoint():
+                        next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL
+                except Exception as e:
+                    self._log("warning", f"Database checkpoint failed: {e}")
+                    next_checkpoint = time.monotonic() + CHECKPOINT_INTERVAL
+
+    def _log(self, level: str, message: str):
+        """Report a background thread message through the plugin logger, or print it"""
+        if self.logger:
+            getattr(self.logger, level)(message)
+        else:
+            print(f"[InventoryDB] {message}")
+
+    def flush(self):
+        """Write all staged inventory and ender chest saves now"""
+        with self._flush_lock:
+            with self._pending_lock:
+                inventories, self._pending_inv = self._pending_inv, {}
+                ender_chests, self._pending_ec = self._pending_ec, {}
+
+            # Each table is written on its own, so one failing doesn't lose the other's rows
+            error = None
+            if inventories:
+                try:
+                    self._write_inventories(list(inventories.items()))
+                except Exception as e:
+                    self._restage(self._pending_inv, inventories)
+                    error = e
+            if ender_chests:
+                try:
+                    self._write_enderchests(list(ender_chests.items()))
+                except Exception as e:
+                    self._restage(self._pending_ec, ender_chests)
+                    error = error or e
+            if error is not None:
+                raise error
+
+    def _restage(self, pending: Dict[str, List[tuple]], failed: Dict[str, List[tuple]]):
+        """Put rows from a failed write back, without replacing any newer save staged meanwhile"""
+        with self._pending_lock:
+            for xuid, values in failed.items():
+                pending.setdefault(xuid, values)
+
+    def close(self):
+        """Write any staged saves, then close database connections"""
+        self._stop_flushing.set()
+        self._flush_thread.join()
+        try:
+            self.flush()
+        finally:
+            super().close()
 
     def create_tables(self):
         """Create database tables if they don't exist"""
@@ -93,11 +377,23 @@ class InventoryDB(DatabaseManager):
             CREATE TABLE IF NOT EXISTS users (
                 xuid TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
+                name_lc TEXT,
                 last_join INTEGER DEFAULT 0,
                 last_leave INTEGER DEFAULT 0
             )
         """)
 
+        # Databases from older versions lack the lowercase name column - add and backfill it
+        columns = [row[1] for row in self.execute("PRAGMA table_info(users)").fetchall()]
+        if "name_lc" not in columns:
+            self.execute("ALTER TABLE users ADD COLUMN name_lc TEXT")
+            rows = self.execute("SELECT xuid, name FROM users").fetchall()
+            with self._lock, self._transaction() as cursor:
+                cursor.executemany(
+                    "UPDATE users SET name_lc = ? WHERE xuid = ?",
+                    [(name.lower(), xuid) for xuid, name in rows]
+                )
+
         # Inventories table
         self.execute("""
             CREATE TABLE IF NOT EXISTS inventories (
@@ -136,292 +432,230 @@ class InventoryDB(DatabaseManager):
         """)
 
         # Create indices for faster lookups
-        self.execute("CREATE INDEX IF NOT EXISTS idx_inventories_xuid ON inventories(xuid)")
-        self.execute("CREATE INDEX IF NOT EXISTS idx_ender_chests_xuid ON ender_chests(xuid)")
-        self.execute("CREATE INDEX IF NOT EXISTS idx_users_name ON users(name)")
+        # Covering indices - get_inventory/get_enderchest are answered from the index alone
+        self.execute("DROP INDEX IF EXISTS idx_inventories_xuid")
+        self.execute("DROP INDEX IF EXISTS idx_ender_chests_xuid")
+        self.execute("""
+            CREATE INDEX IF NOT EXISTS idx_inventories_cover ON inventories(
+                xuid, slot_type, slot, name, type, amount, damage, unbreakable, data, display_name, enchants, lore
+            )
+        """)
+        self.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ender_chests_cover ON ender_chests(
+                xuid, slot, name, type, amount, damage, unbreakable, data, display_name, enchants, lore
+            )
+        """)
+        # Name lookups go through name_lc - the old index on name is only write overhead
+        self.execute("DROP INDEX IF EXISTS idx_users_name")
+        self.execute("CREATE INDEX IF NOT EXISTS idx_users_name_lc ON users(name_lc)")
+
+        # One row per slot - lets saves upsert instead of delete + re-insert
+        self.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_inventories_slot ON inventories(xuid, slot_type, slot)")
+        self.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ender_chests_slot ON ender_chests(xuid, slot)")
 
     def save_user(self, player: Player, join_time: int):
         """Save or update user information"""
         with self._lock:
-            self.cursor.execute("""
-                INSERT OR REPLACE INTO users (xuid, name, last_join)
-                VALUES (?, ?, ?)
-            """, (player.xuid, player.name, join_time))
-            self.conn.commit()
+            self.conn.execute(_SQL_SAVE_USER, (player.xuid, player.name, player.name.lower(), join_time))
+            self.last_write = time.monotonic()
 
     def update_user_leave_time(self, xuid: str, leave_time: int):
         """Update user's last leave time"""
         with self._lock:
-            self.cursor.execute("""
-                UPDATE users SET last_leave = ? WHERE xuid = ?
-            """, (leave_time, xuid))
-            self.conn.commit()
+            self.conn.execute(_SQL_UPDATE_LEAVE, (leave_time, xuid))
+            self.last_write = time.monotonic()
 
     def get_user_by_name(self, name: str) -> Optional[User]:
-        """Get user by name (case-insensitive partial match)"""
-        self.cursor.execute("""
-            SELECT xuid, name, last_join, last_leave
-            FROM users
-            WHERE LOWER(name) LIKE LOWER(?)
-            ORDER BY last_join DESC
-            LIMIT 1
-        """, (f"%{name}%",))
-
-        row = self.cursor.fetchone()
+        """Get user by name (case-insensitive, prefix matches first, then partial match)"""
+        name_lc = name.lower()
+        with self._read_connection() as conn:
+            # Prefix match is a range seek on idx_users_name_lc
+            row = conn.execute(_SQL_USER_BY_PREFIX, (name_lc, name_lc + "\U0010ffff")).fetchone()
+            if not row:
+                row = conn.execute(_SQL_USER_BY_SUBSTRING, (name_lc,)).fetchone()
+
         if row:
             return User(xuid=row[0], name=row[1], last_join=row[2], last_leave=row[3])
         return None
 
     def search_users_by_name(self, name: str) -> List[User]:
-        """Search for users by name (case-insensitive partial match)"""
-        self.cursor.execute("""
-            SELECT xuid, name, last_join, last_leave
-            FROM users
-            WHERE LOWER(name) LIKE LOWER(?)
-            ORDER BY last_join DESC
-        """, (f"%{name}%",))
+        """Search for users by name (case-insensitive partial match)
+
+        A substring can match anywhere in the name, so this always scans the users table.
+        """
+        with self._read_connection() as conn:
+            rows = conn.execute(_SQL_SEARCH_USERS, (name.lower(),)).fetchall()
 
         users = []
-        for row in self.cursor.fetchall():
+        for row in rows:
             users.append(User(xuid=row[0], name=row[1], last_join=row[2], last_leave=row[3]))
         return users
 
-    def save_inventory(self, player: Player):
-        """Save player's inventory to database"""
-        # Prepare inventory data
+    def _inventory_rows(self, player: Player) -> List[tuple]:
+        """Build the inventories rows for a player's current inventory"""
         values = []
+        xuid, name = player.xuid, player.name
+        inventory = player.inventory
+        get_item = inventory.get_item
 
         # Main inventory slots
-        for i in range(player.inventory.size):
-            item = player.inventory.get_item(i)
-            if not item or str(item.type) == "minecraft:air":
+        for i in range(inventory.size):
+            item = get_item(i)
+            item_type = _stored_type(item)
+            if item_type is None:
                 continue
-
-            # Extract item metadata
-            meta = getattr(item, "item_meta", None)
-            display_name = ""
-            enchants = {}
-            lore = []
-            unbreakable = False
-
-            if meta:
-                display_name = getattr(meta, "display_name", "")
-                enchants = getattr(meta, "enchants", {})
-                lore = getattr(meta, "lore", [])
-                unbreakable = getattr(meta, "is_unbreakable", False)
-
-            values.append((
-                player.xuid,
-                player.name,
-                "slot",
-                i,
-                str(item.type),
-                item.amount,
-                getattr(meta, "damage", 0) if meta else 0,
-                display_name,
-                json.dumps(enchants),
-                json.dumps(lore),
-                1 if unbreakable else 0,
-                getattr(item, "data", None)
-            ))
+            values.append((xuid, name, "slot", i) + _item_columns(item, item_type))
 
         # Armor slots
         armor_items = [
-            ("helmet", getattr(player.inventory, "helmet", None)),
-            ("chestplate", getattr(player.inventory, "chestplate", None)),
-            ("leggings", getattr(player.inventory, "leggings", None)),
-            ("boots", getattr(player.inventory, "boots", None)),
-            ("offhand", getattr(player.inventory, "item_in_off_hand", None))
+            ("helmet", getattr(inventory, "helmet", None)),
+            ("chestplate", getattr(inventory, "chestplate", None)),
+            ("leggings", getattr(inventory, "leggings", None)),
+            ("boots", getattr(inventory, "boots", None)),
+            ("offhand", getattr(inventory, "item_in_off_hand", None))
         ]
 
         for slot_type, item in armor_items:
-            if not item or str(item.type) == "minecraft:air":
+            item_type = _stored_type(item)
+            if item_type is None:
                 continue
+            # Armor slots don't have slot numbers
+            values.append((xuid, name, slot_type, 0) + _item_columns(item, item_type))
 
-            meta = getattr(item, "item_meta", None)
-            display_name = ""
-            enchants = {}
-            lore = []
-            unbreakable = False
-
-            if meta:
-                display_name = getattr(meta, "display_name", "")
-                enchants = getattr(meta, "enchants", {})
-                lore = getattr(meta, "lore", [])
-                unbreakable = getattr(meta, "is_unbreakable", False)
-
-            values.append((
-                player.xuid,
-                player.name,
-                slot_type,
-                0,  # Armor slots don't have slot numbers
-                str(item.type),
-                item.amount,
-                getattr(meta, "damage", 0) if meta else 0,
-                display_name,
-                json.dumps(enchants),
-                json.dumps(lore),
-                1 if unbreakable else 0,
-                getattr(item, "data", None)
-            ))
-
-        # Save to database
-        with self._lock:
-            # Delete old inventory data
-            self.cursor.execute("DELETE FROM inventories WHERE xuid = ?", (player.xuid,))
+        return values
 
-            # Insert new inventory data
-            if values:
-                self.cursor.executemany("""
-                    INSERT INTO inventories
-                    (xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, values)
-
-            self.conn.commit()
+    def save_inventory(self, player: Player):
+        """Stage player's inventory - written to the database by the next flush"""
+        values = self._inventory_rows(player)
+        with self._pending_lock:
+            self._pending_inv[player.xuid] = values
+
+    def save_many_inventories(self, players: List[Player]):
+        """Save several players' inventories immediately, in a single transaction"""
+        rows = [(player.xuid, self._inventory_rows(player)) for player in players]
+        with self._pending_lock:
+            self._pending_inv.update(rows)
+        self.flush()
+
+    def _write_inventories(self, rows: List[tuple]):
+        """Replace the stored inventories for each (xuid, values) pair in one transaction"""
+        # Serialize enchants/lore here, on the flush thread, rather than in the caller
+        encoded = [_encode_row(value, 8) for _, values in rows for value in values]
+
+        with self._lock, self._transaction() as cursor:
+            # Upsert current items - unchanged rows are left untouched
+            cursor.executemany(_SQL_UPSERT_INV, encoded)
+
+            # Delete slots that are now empty
+            for xuid, values in rows:
+                if values:
+                    keys = ", ".join("(?, ?)" for _ in values)
+                    params = [xuid]
+                    for row in values:
+                        params.extend((row[2], row[3]))
+                    cursor.execute(f"{_SQL_DELETE_INV} AND (slot_type, slot) NOT IN (VALUES {keys})", params)
+                else:
+                    cursor.execute(_SQL_DELETE_INV, (xuid,))
 
     def get_inventory(self, xuid: str) -> List[Dict[str, Any]]:
         """Get player's inventory from database"""
-        self.cursor.execute("""
-            SELECT xuid, name, slot_type, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data
-            FROM inventories
-            WHERE xuid = ?
-        """, (xuid,))
-
-        items = []
-        for row in self.cursor.fetchall():
-            try:
-                # Parse JSON fields
-                enchants = {}
-                lore = []
-
-                if row[8] and row[8] not in ("null", "0", ""):
-                    try:
-                        enchants = json.loads(row[8])
-                    except:
-                        enchants = {}
-
-                if row[9] and row[9] not in ("null", "0", ""):
-                    try:
-                        lore = json.loads(row[9])
-                    except:
-                        lore = []
-
-                items.append({
-                    "xuid": row[0],
-                    "name": row[1],
-                    "slot_type": row[2],
-                    "slot": int(row[3]) if row[3] is not None else 0,
-                    "type": row[4] or "minecraft:air",
-                    "amount": int(row[5]) if row[5] is not None else 1,
-                    "damage": int(row[6]) if row[6] is not None else 0,
-                    "display_name": row[7] or "",
-                    "enchants": enchants,
-                    "lore": lore,
-                    "unbreakable": bool(row[10]) if row[10] is not None else False,
-                    "data": int(row[11]) if row[11] is not None else None
-                })
-            except Exception as e:
-                print(f"[InventoryDB] Failed to load inventory row for {xuid}: {e}")
-                continue
-
-        return items
+        # Wait for any flush in progress, so a save that was just taken off the queue is visible
+        with self._flush_lock:
+            if xuid in self._pending_inv:
+                self.flush()
+            with self._read_connection() as conn:
+                rows = conn.execute(_SQL_SELECT_INV, (xuid,)).fetchall()
+
+        # INTEGER columns already come back as int (or None) - no coercion needed
+        return [
+            {
+                "xuid": row["xuid"],
+                "name": row["name"],
+                "slot_type": row["slot_type"],
+                "slot": row["slot"],
+                "type": row["type"],
+                "amount": row["amount"],
+                "damage": row["damage"] or 0,
+                "display_name": row["display_name"] or "",
+                "enchants": _parse_json(row["enchants"], dict),
+                "lore": _parse_json(row["lore"], list),
+                "unbreakable": row["unbreakable"] == 1,
+                "data": row["data"]
+            }
+            for row in rows
+        ]
 
-    def save_enderchest(self, player: Player):
-        """Save player's ender chest to database"""
+    def _enderchest_rows(self, player: Player) -> List[tuple]:
+        """Build the ender_chests rows for a player's current ender chest"""
         values = []
+        xuid, name = player.xuid, player.name
+        ender_chest = player.ender_chest
+        get_item = ender_chest.get_item
 
         # Ender chest slots
-        for i in range(player.ender_chest.size):
-            item = player.ender_chest.get_item(i)
-            if not item or str(item.type) == "minecraft:air":
+        for i in range(ender_chest.size):
+            item = get_item(i)
+            item_type = _stored_type(item)
+            if item_type is None:
                 continue
+            values.append((xuid, name, i) + _item_columns(item, item_type))
 
-            # Extract item metadata
-            meta = getattr(item, "item_meta", None)
-            display_name = ""
-            enchants = {}
-            lore = []
-            unbreakable = False
-
-            if meta:
-                display_name = getattr(meta, "display_name", "")
-                enchants = getattr(meta, "enchants", {})
-                lore = getattr(meta, "lore", [])
-                unbreakable = getattr(meta, "is_unbreakable", False)
-
-            values.append((
-                player.xuid,
-                player.name,
-                i,
-                str(item.type),
-                item.amount,
-                getattr(meta, "damage", 0) if meta else 0,
-                display_name,
-                json.dumps(enchants),
-                json.dumps(lore),
-                1 if unbreakable else 0,
-                getattr(item, "data", None)
-            ))
-
-        # Save to database
-        with self._lock:
-            # Delete old ender chest data
-            self.cursor.execute("DELETE FROM ender_chests WHERE xuid = ?", (player.xuid,))
-
-            # Insert new ender chest data
-            if values:
-                self.cursor.executemany("""
-                    INSERT INTO ender_chests
-                    (xuid, name, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, values)
+        return values
 
-            self.conn.commit()
+    def save_enderchest(self, player: Player):
+        """Stage player's ender chest - written to the database by the next flush"""
+        values = self._enderchest_rows(player)
+        with self._pending_lock:
+            self._pending_ec[player.xuid] = values
+
+    def save_many_enderchests(self, players: List[Player]):
+        """Save several players' ender chests immediately, in a single transaction"""
+        rows = [(player.xuid, self._enderchest_rows(player)) for player in players]
+        with self._pending_lock:
+            self._pending_ec.update(rows)
+        self.flush()
+
+    def _write_enderchests(self, rows: List[tuple]):
+        """Replace the stored ender chests for each (xuid, values) pair in one transaction"""
+        # Serialize enchants/lore here, on the flush thread, rather than in the caller
+        encoded = [_encode_row(value, 7) for _, values in rows for value in values]
+
+        with self._lock, self._transaction() as cursor:
+            # Upsert current items - unchanged rows are left untouched
+            cursor.executemany(_SQL_UPSERT_EC, encoded)
+
+            # Delete slots that are now empty
+            for xuid, values in rows:
+                if values:
+                    slots = ", ".join("?" for _ in values)
+                    cursor.execute(f"{_SQL_DELETE_EC} AND slot NOT IN ({slots})", [xuid] + [row[2] for row in values])
+                else:
+                    cursor.execute(_SQL_DELETE_EC, (xuid,))
 
     def get_enderchest(self, xuid: str) -> List[Dict[str, Any]]:
         """Get player's ender chest from database"""
-        self.cursor.execute("""
-            SELECT xuid, name, slot, type, amount, damage, display_name, enchants, lore, unbreakable, data
-            FROM ender_chests
-            WHERE xuid = ?
-        """, (xuid,))
-
-        items = []
-        for row in self.cursor.fetchall():
-            try:
-                # Parse JSON fields
-                enchants = {}
-                lore = []
-
-                if row[7] and row[7] not in ("null", "0", ""):
-                    try:
-                        enchants = json.loads(row[7])
-                    except:
-                        enchants = {}
-
-                if row[8] and row[8] not in ("null", "0", ""):
-                    try:
-                        lore = json.loads(row[8])
-                    except:
-                        lore = []
-
-                items.append({
-                    "xuid": row[0],
-                    "name": row[1],
-                    "slot": int(row[2]) if row[2] is not None else 0,
-                    "type": row[3] or "minecraft:air",
-                    "amount": int(row[4]) if row[4] is not None else 1,
-                    "damage": int(row[5]) if row[5] is not None else 0,
-                    "display_name": row[6] or "",
-                    "enchants": enchants,
-                    "lore": lore,
-                    "unbreakable": bool(row[9]) if row[9] is not None else False,
-                    "data": int(row[10]) if row[10] is not None else None
-                })
-            except Exception as e:
-                print(f"[InventoryDB] Failed to load ender chest row for {xuid}: {e}")
-                continue
-
-        return items
+        # Wait for any flush in progress, so a save that was just taken off the queue is visible
+        with self._flush_lock:
+            if xuid in self._pending_ec:
+                self.flush()
+            with self._read_connection() as conn:
+                rows = conn.execute(_SQL_SELECT_EC, (xuid,)).fetchall()
+
+        # INTEGER columns already come back as int (or None) - no coercion needed
+        return [
+            {
+                "xuid": row["xuid"],
+                "name": row["name"],
+                "slot": row["slot"],
+                "type": row["type"],
+                "amount": row["amount"],
+                "damage": row["damage"] or 0,
+                "display_name": row["display_name"] or "",
+                "enchants": _parse_json(row["enchants"], dict),
+                "lore": _parse_json(row["lore"], list),
+                "unbreakable": row["unbreakable"] == 1,
+                "data": row["data"]
+            }
+            for row in rows
+        ]
 
@@ -2,30 +2,109 @@ from endstone.plugin import Plugin
 from endstone.command import Command, CommandSender
 from endstone.event import event_handler, PlayerJoinEvent, PlayerQuitEvent
 from endstone.form import ActionForm, MessageForm, ModalForm, TextInput
+from endstone.inventory import ItemStack
 from endstone import Player
+import importlib
+import importlib.util
 import os
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from .db_util import InventoryDB
 
-# Try to import ChestForm for visual inventory display
-try:
-    from chest_form_api_endstone import ChestForm
-    CHEST_FORM_AVAILABLE = True
-except ImportError:
-    CHEST_FORM_AVAILABLE = False
-
-# Try to import RapidNBT for offline player data
-try:
-    import rapidnbt as RapidNBT
-    RAPIDNBT_AVAILABLE = True
-except ImportError:
-    try:
-        import RapidNBT
-        RAPIDNBT_AVAILABLE = True
-    except ImportError:
-        RAPIDNBT_AVAILABLE = False
-        print("[InventoryManager] RapidNBT not available - offline player viewing disabled")
+# Optional dependencies are only located here; load_optional_modules() imports them once at enable
+# ChestForm for visual inventory display
+_CHEST_FORM_MODULE = (
+    "chest_form_api_endstone" if importlib.util.find_spec("chest_form_api_endstone") is not None else None
+)
+ChestForm = None
+
+# RapidNBT for offline player data
+_RAPIDNBT_MODULE = next(
+    (name for name in ("rapidnbt", "RapidNBT") if importlib.util.find_spec(name) is not None), None
+)
+RapidNBT = None
+if _RAPIDNBT_MODULE is None:
+    print("[InventoryManager] RapidNBT not available - offline player viewing disabled")
+
+
+def load_optional_modules() -> tuple:
+    """Import the located optional modules - returns (ChestForm available, RapidNBT available)"""
+    global ChestForm, RapidNBT
+    if ChestForm is None and _CHEST_FORM_MODULE:
+        try:
+            from chest_form_api_endstone import ChestForm
+        except ImportError as e:
+            print(f"[InventoryManager] ChestForm failed to import - visual chest display disabled: {e}")
+    if RapidNBT is None and _RAPIDNBT_MODULE:
+        try:
+            RapidNBT = importlib.import_module(_RAPIDNBT_MODULE)
+        except ImportError as e:
+            print(f"[InventoryManager] RapidNBT failed to import - offline player viewing disabled: {e}")
+    return ChestForm is not None, RapidNBT is not None
+
+
+# Form button indices - the Offline and View Only buttons are only shown (and matched) when the
+# plugin loaded their dependencies at enable
+# Main menu: Online, [Offline], Close
+BTN_MAIN_ONLINE = 0
+BTN_MAIN_OFFLINE = 1
+# Inspect menu: Inventory, Ender Chest, Back
+BTN_INSPECT_INV = 0
+BTN_INSPECT_ENDER = 1
+# View mode menus: Actions, [View Only], Back
+BTN_VIEW_LIST = 0
+BTN_VIEW_CHEST = 1
+# Slot actions menu
+BTN_SLOT_TAKE = 0
+BTN_SLOT_COPY = 1
+BTN_SLOT_REMOVE = 2
+BTN_SLOT_BACK = 3
+BTN_SLOT_PLAYER = 4
+# Offline item menu: Copy, Back
+BTN_OFFLINE_COPY = 0
+
+# Worker threads used to parse player .dat files during an offline name search
+NBT_READ_WORKERS = min(4, os.cpu_count() or 1)
+
+# Matches on each side of the picked one whose player files are re-read in the background
+PREFETCH_NEIGHBOURS = 2
+
+# Status shown after an offline NBT item is copied
+MSG_COPIED = "§aCopied item to your inventory!"
+
+# Shown in place of items whose type can't be read
+UNKNOWN_ITEM_TYPE = "minecraft:barrier"
+
+# Item type ids treated as empty slots
+AIR_TYPES = frozenset({"air", "minecraft:air"})
+
+# Slot -> chest form slot for the visual view (-1 = not shown)
+# Ender chest: direct mapping (0-26)
+ENDER_TO_CHEST = tuple(range(27))
+# Player inventory: main inventory (9-35) -> chest slots 0-26, hotbar (0-8) -> chest slots 27-35.
+# Armor/offhand slots are handled separately by allow_armor
+INV_TO_CHEST = tuple(i - 9 if i >= 9 else 27 + i for i in range(36))
+
+# Where Bedrock servers keep player .dat files, in lookup order
+PLAYER_DATA_PATHS = (
+    Path("worlds") / "Bedrock level" / "players",  # Default Bedrock world
+    Path("worlds") / "world" / "players",           # Alternative name
+    Path("Bedrock level") / "players",              # Direct path
+    Path("world") / "players",                      # Direct alternative
+)
+
+# Maximum number of parsed player .dat files kept in memory
+NBT_CACHE_SIZE = 64
+
+# Maximum number of item type -> display name entries kept in memory
+DISPLAY_NAME_CACHE_SIZE = 4096
+
+# item type -> display name, for items without a custom name
+_display_names = {}
 
 
 # ──────────────────────────────────────────────────────────────────────
@@ -74,15 +153,30 @@ def get_item_from_slot(inventory, slot: int):
         return None
 
 
+def get_contents(inventory, size: int) -> list:
+    """Get all items of an inventory in one call, falling back to per-slot reads"""
+    contents = getattr(inventory, "contents", None)
+    if contents is not None:
+        contents = list(contents)
+        if len(contents) >= size:
+            return contents[:size]
+    return [get_item_from_slot(inventory, i) for i in range(size)]
+
+
 def is_air(item) -> bool:
     """Check if item is air/empty"""
     if item is None:
         return True
-    try:
-        item_type = str(item.type).lower()
-        return item_type in ["air", "minecraft:air"] or item.amount == 0
-    except AttributeError:
+    item_type = getattr(item, "type", None)
+    if item_type is None:
         return True
+    item_type = str(item_type)
+    # Exact match first - lower() only runs for unusual casing
+    return (
+        item_type in AIR_TYPES
+        or item_type.lower() in AIR_TYPES
+        or getattr(item, "amount", 0) == 0
+    )
 
 
 def item_display_name(item) -> str:
@@ -93,29 +187,158 @@ def item_display_name(item) -> str:
             return item.custom_name
         # Fall back to type name
         if hasattr(item, 'type'):
-            return str(item.type).replace("_", " ").title()
+            key = str(item.type)
+            name = _display_names.get(key)
+            if name is None:
+                name = key.replace("_", " ").title()
+                if len(_display_names) >= DISPLAY_NAME_CACHE_SIZE:
+                    # Evict the oldest entry
+                    del _display_names[next(iter(_display_names))]
+                _display_names[key] = name
+            return name
         return "Unknown Item"
     except AttributeError:
         return "Unknown Item"
 
 
+def item_amount(item) -> int:
+    """Get item stack size"""
+    amount = getattr(item, "amount", None)
+    if amount:
+        return amount
+    return getattr(item, "count", None) or 1
+
+
 def add_item(inventory, item) -> bool:
     """Add item to inventory, returns True if successful"""
+    add = getattr(inventory, "add_item", None)
+    if add is None:
+        return False
     try:
-        result = inventory.add_item(item)
-        # If result is empty dict or None, item was added successfully
-        return not result or len(result) == 0
-    except (AttributeError, Exception):
+        result = add(item)
+    except (IndexError, TypeError, RuntimeError):
         return False
+    # If result is empty dict or None, item was added successfully
+    return not result
 
 
 def set_item_in_slot(inventory, slot: int, item) -> bool:
     """Set item in specific slot, returns True if successful"""
+    set_item = getattr(inventory, "set_item", None)
+    if set_item is None:
+        return False
     try:
-        inventory.set_item(slot, item)
-        return True
-    except (AttributeError, IndexError, Exception):
+        set_item(slot, item)
+    except (IndexError, TypeError, RuntimeError):
         return False
+    return True
+
+
+def slim_player_nbt(nbt_data) -> dict:
+    """Keep only the player name and ender chest items from a parsed player .dat"""
+    return {
+        "PlayerName": nbt_data.get("PlayerName", ""),
+        "EnderChestInventory": [
+            item for item in nbt_data.get("EnderChestInventory", []) if isinstance(item, dict)
+        ]
+    }
+
+
+def probe_item_meta() -> tuple:
+    """Check which item meta fields this Endstone build exposes: (item_meta, display_name, lore)"""
+    try:
+        meta = getattr(ItemStack("minecraft:stone", 1), "item_meta", None)
+    except Exception:
+        # Only gates optional meta copying - never let the probe abort on_enable
+        return False, False, False
+    if meta is None:
+        return False, False, False
+    return True, hasattr(meta, "display_name"), hasattr(meta, "lore")
+
+
+@lru_cache(maxsize=NBT_CACHE_SIZE)
+def read_player_nbt(path: str, mtime_ns: int) -> dict:
+    """Read the parts of a player .dat file the offline views use (mtime_ns keys out stale parses)"""
+    return slim_player_nbt(RapidNBT.read_nbt(path))
+
+
+def ender_entries(ender_items) -> list:
+    """Flatten NBT ender chest items to (slot, type, count, display name, item data), sorted by slot"""
+    entries = []
+    _get = dict.get
+    # slim_player_nbt already dropped everything that isn't a dict
+    for item_data in ender_items:
+        slot = _get(item_data, "Slot", -1)
+        if not 0 <= slot <= 26:
+            continue
+
+        item_type = _get(item_data, "Name", UNKNOWN_ITEM_TYPE)
+        if type(item_type) is str:
+            # Share one string object per item id across every cached ender chest
+            item_type = sys.intern(item_type)
+
+        # Get display name
+        display_name = ""
+        tag = _get(item_data, "tag", None)
+        if isinstance(tag, dict):
+            display = _get(tag, "display", None)
+            if isinstance(display, dict):
+                display_name = _get(display, "Name", "")
+
+        name = display_name if display_name else item_type.replace("minecraft:", "")
+        entries.append((slot, item_type, _get(item_data, "Count", 1), name, item_data))
+    entries.sort(key=lambda entry: entry[0])
+    return entries
+
+
+def ender_chest_records(entries) -> list:
+    """Turn flattened ender chest entries into (slot, type, ChestForm.set_slot kwargs) records"""
+    records = []
+    _get = dict.get
+    for slot, item_type, item_count, _, item_data in entries:
+        item_damage = _get(item_data, "Damage", 0)
+
+        tag = _get(item_data, "tag", None)
+        if not tag or not isinstance(tag, dict):
+            # Plain item (the usual case) - no display or enchantment data to dig out
+            records.append((slot, item_type, {
+                "item_amount": item_count,
+                "item_data": item_damage,
+                "display_name": "",
+                "lore": None,
+                "enchants": None,
+            }))
+            continue
+
+        # Extract display name and lore from tag
+        display_name = ""
+        lore = None
+        enchants = None
+
+        tag_get = tag.get
+        display = tag_get("display")
+        if isinstance(display, dict):
+            display_name = _get(display, "Name", "")
+            lore_data = _get(display, "Lore", None)
+            if isinstance(lore_data, list) and lore_data:
+                lore = lore_data
+
+        # Get enchantments
+        ench_data = tag_get("ench")
+        if isinstance(ench_data, list) and ench_data:
+            enchants = {
+                "Enchantment %s" % _get(ench, "id", 0): _get(ench, "lvl", 1)
+                for ench in ench_data if isinstance(ench, dict)
+            }
+
+        records.append((slot, item_type, {
+            "item_amount": item_count,
+            "item_data": item_damage,
+            "display_name": display_name,
+            "lore": lore,
+            "enchants": enchants,
+        }))
+    return records
 
 
 # ──────────────────────────────────────────────────────────────────────
@@ -143,56 +366,120 @@ class InventoryManagerPlugin(Plugin):
     def on_enable(self) -> None:
         """Called when plugin is enabled"""
         self.logger.info("Inventory Manager Plugin enabled!")
-        self.logger.info(f"ChestForm available: {CHEST_FORM_AVAILABLE}")
-        self.logger.info(f"RapidNBT available: {RAPIDNBT_AVAILABLE}")
+
+        # Import the optional modules once - which features and buttons are offered is fixed from here on
+        self._chest_form_available, self._rapidnbt_available = load_optional_modules()
+        self._offline_available = self._chest_form_available and self._rapidnbt_available
+        self.logger.info(f"ChestForm available: {self._chest_form_available}")
+        self.logger.info(f"RapidNBT available: {self._rapidnbt_available}")
+
+        # (players folder, folder mtime, [(file path, file stem)]) from the last .dat scan
+        self._offline_cache = None
+        # player file -> [parsed NBT, flattened ender chest entries, slot -> entry, chest records] for the offline views
+        self._ender_entries_cache = {}
+        # (xuid, "inv"/"ender") -> inventory object, resolved once per online session
+        self._containers = {}
+        # (xuid, menu) -> built per-target menu form; the callbacks only depend on the target
+        self._forms = {}
+        # Resolved players folder, found by the background discovery thread or on first use
+        self._player_data_path = None
+
+        self._nbt_pool = None
+
+        if self._rapidnbt_available:
+            # Locate and list player files off the server thread so the first search doesn't stall a tick
+            threading.Thread(target=self._discover_offline_players, daemon=True).start()
+            # Uncached player files in a name search are parsed in parallel
+            self._nbt_pool = ThreadPoolExecutor(max_workers=NBT_READ_WORKERS, thread_name_prefix="InventoryManager-NBT")
 
         # Initialize database
         try:
-            self.db = InventoryDB()
+            self.db = InventoryDB(logger=self.logger)
             self.logger.info("Database initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize database: {e}")
             self.db = None
 
-        if RAPIDNBT_AVAILABLE and CHEST_FORM_AVAILABLE:
+        if self._offline_available:
             self.logger.info("Offline player ender chest viewing is ENABLED (Database + NBT fallback)")
         else:
             self.logger.warning("Offline player viewing is DISABLED - missing dependencies")
-            if not CHEST_FORM_AVAILABLE:
+            if not self._chest_form_available:
                 self.logger.warning("  - ChestForm not found (install chest_form_api_endstone)")
-            if not RAPIDNBT_AVAILABLE:
+            if not self._rapidnbt_available:
                 self.logger.warning("  - RapidNBT not found (install RapidNBT)")
 
+        # Item meta support is fixed for the server build - probe it once instead of per copied item
+        self._has_item_meta, self._meta_has_display_name, self._meta_has_lore = probe_item_meta()
+
+        # Resolve the permission once; has_permission takes the Permission object as well as its name
+        self._use_permission = (
+            self.server.plugin_manager.get_permission("inventory_manager.use") or "inventory_manager.use"
+        )
+        # Command name -> handler called with the player who ran it
+        self._command_handlers = {"manageinv": self.open}
+
         self.register_events(self)
 
     def on_disable(self) -> None:
         """Called when plugin is disabled"""
         # Close database connection
         if hasattr(self, 'db') and self.db:
+            # Save everyone still online in one transaction (e.g. on server shutdown)
+            try:
+                players = list(online_players(self))
+                if players:
+                    self.db.save_many_inventories(players)
+                    self.db.save_many_enderchests(players)
+                    self.logger.info(f"Saved data for {len(players)} online player(s)")
+            except Exception as e:
+                self.logger.error(f"Failed to save online players on disable: {e}")
+
             try:
                 self.db.close()
                 self.logger.info("Database connection closed")
             except Exception as e:
                 self.logger.error(f"Error closing database: {e}")
 
+        if getattr(self, '_nbt_pool', None):
+            self._nbt_pool.shutdown(wait=False, cancel_futures=True)
+
         self.logger.info("Inventory Manager Plugin disabled!")
 
     def on_command(self, sender: CommandSender, command: Command, args: list[str]) -> bool:
         """Handle commands"""
-        if command.name == "manageinv":
-            if not isinstance(sender, Player):
-                sender.send_error_message("This command can only be used by players!")
-                return True
-            
-            if not sender.has_permission("inventory_manager.use"):
-                sender.send_error_message("§cYou don't have permission to use this command!")
-                return True
-            
-            # Open the main menu
-            self.open(sender)
+        handler = self._command_handlers.get(command.name)
+        if handler is None:
+            return False
+
+        if not isinstance(sender, Player):
+            sender.send_error_message("This command can only be used by players!")
+            return True
+
+        if not sender.has_permission(self._use_permission):
+            sender.send_error_message("§cYou don't have permission to use this command!")
             return True
-        
-        return False
+
+        handler(sender)
+        return True
+
+    def _container(self, player: Player, which: str):
+        """Get a player's inventory ("inv") or ender chest ("ender"), cached until they quit"""
+        key = (player.xuid, which)
+        inv = self._containers.get(key)
+        if inv is None:
+            inv = get_inventory(player) if which == "inv" else get_ender(player)
+            if inv is not None:
+                self._containers[key] = inv
+        return inv
+
+    def _forget_player(self, player: Player):
+        """Drop everything cached for a player who left"""
+        xuid = player.xuid
+        self._containers.pop((xuid, "inv"), None)
+        self._containers.pop((xuid, "ender"), None)
+        for menu in ("inspect", "inv", "ender"):
+            self._forms.pop((xuid, menu), None)
 
     # ──────────────────────────────────────────────────────────────────────
     # EVENT HANDLERS
@@ -215,6 +502,8 @@ class InventoryManagerPlugin(Plugin):
     @event_handler
     def on_player_quit(self, event: PlayerQuitEvent):
         """Handle player quit - save inventory and ender chest to database"""
+        self._forget_player(event.player)
+
         if not hasattr(self, 'db') or not self.db:
             return
 
@@ -246,22 +535,17 @@ class InventoryManagerPlugin(Plugin):
             title="§l§6Inventory Manager",
             content="§7Manage player inventories"
         )
-        form.add_button("§aOnline Players")
-
-        if RAPIDNBT_AVAILABLE and CHEST_FORM_AVAILABLE:
-            form.add_button("§eOffline Players §7(Ender Chest Only)")
-            form.add_button("§cClose")
-        else:
-            form.add_button("§cClose")
+        form.add_button("§aOnline Players")  # BTN_MAIN_ONLINE
+        if self._offline_available:
+            form.add_button("§eOffline Players §7(Ender Chest Only)")  # BTN_MAIN_OFFLINE
+        form.add_button("§cClose")
 
         def on_submit(pl, idx):
-            if idx == 0:
+            if idx == BTN_MAIN_ONLINE:
                 return self._pick_online_player(pl)
-            elif idx == 1:
-                if RAPIDNBT_AVAILABLE and CHEST_FORM_AVAILABLE:
-                    return self._pick_offline_player(pl)
-                # else: close
-            # idx == 2 or None: close
+            elif self._offline_available and idx == BTN_MAIN_OFFLINE:
+                return self._pick_offline_player(pl)
+            # Close or None: close
 
         form.on_submit = on_submit
         player.send_form(form)
@@ -284,11 +568,8 @@ class InventoryManagerPlugin(Plugin):
         def on_submit(pl, idx):
             if idx is None or idx < 0 or idx >= len(names):
                 return self.open(pl)
-            # resolve live object again, avoid stale refs
-            target = None
-            for live in online_players(self):
-                if player_name(live) == names[idx]:
-                    target = live; break
+            # resolve live object again, avoid stale refs - server lookup by name, no list walk
+            target = self.server.get_player(names[idx])
             if not target:
                 pl.send_message("§7Player went offline.")
                 return self._pick_online_player(pl)
@@ -298,92 +579,88 @@ class InventoryManagerPlugin(Plugin):
 
     def _inspect_online_player(self, viewer: Player, target: Player):
         """Main inspection menu - choose between Inventory or Ender Chest"""
-        tname = player_name(target)
-        form = ActionForm(
-            title=f"§lInspect: {tname}",
-            content="Choose what to inspect:"
-        )
-        form.add_button("§6Inventory")      # 0
-        form.add_button("§dEnder Chest")    # 1
-        form.add_button("Back")             # 2
-
-        def pick(pl, idx):
-            if idx == 0:
-                return self._inventory_options(pl, target)
-            elif idx == 1:
-                return self._enderchest_options(pl, target)
-            else:
-                return self._pick_online_player(pl)
+        key = (target.xuid, "inspect")
+        form = self._forms.get(key)
+        if form is None:
+            tname = player_name(target)
+            form = ActionForm(
+                title=f"§lInspect: {tname}",
+                content="Choose what to inspect:"
+            )
+            form.add_button("§6Inventory")      # BTN_INSPECT_INV
+            form.add_button("§dEnder Chest")    # BTN_INSPECT_ENDER
+            form.add_button("Back")
+
+            def pick(pl, idx):
+                if idx == BTN_INSPECT_INV:
+                    return self._inventory_options(pl, target)
+                elif idx == BTN_INSPECT_ENDER:
+                    return self._enderchest_options(pl, target)
+                else:
+                    return self._pick_online_player(pl)
 
-        form.on_submit = pick
+            form.on_submit = pick
+            self._forms[key] = form
         viewer.send_form(form)
 
     def _inventory_options(self, viewer: Player, target: Player):
         """Sub-menu for Inventory viewing options"""
-        tname = player_name(target)
-        form = ActionForm(
-            title=f"§l{tname}'s Inventory",
-            content="Choose how to view:\n\n§eActions§r - Take/Copy/Remove items\n§bView Only§r - Visual chest display"
-        )
-        form.add_button("§eActions (List View)")  # 0
-
-        if CHEST_FORM_AVAILABLE:
-            form.add_button("§bView Only (Visual Chest)")  # 1
-            form.add_button("« Back")                      # 2
-        else:
-            form.add_button("« Back")                      # 1
+        key = (target.xuid, "inv")
+        form = self._forms.get(key)
+        if form is None:
+            tname = player_name(target)
+            form = ActionForm(
+                title=f"§l{tname}'s Inventory",
+                content="Choose how to view:\n\n§eActions§r - Take/Copy/Remove items\n§bView Only§r - Visual chest display"
+            )
+            form.add_button("§eActions (List View)")  # BTN_VIEW_LIST
+            if self._chest_form_available:
+                form.add_button("§bView Only (Visual Chest)")  # BTN_VIEW_CHEST
+            form.add_button("« Back")
 
-        def pick(pl, idx):
-            if idx == 0:
-                return self._open_container(pl, target, which="inv")
-            elif idx == 1:
-                if CHEST_FORM_AVAILABLE:
+            def pick(pl, idx):
+                if idx == BTN_VIEW_LIST:
+                    return self._open_container(pl, target, which="inv")
+                elif self._chest_form_available and idx == BTN_VIEW_CHEST:
                     return self._show_chest_form(pl, target, which="inv")
                 else:
                     return self._inspect_online_player(pl, target)
-            else:
-                return self._inspect_online_player(pl, target)
 
-        form.on_submit = pick
+            form.on_submit = pick
+            self._forms[key] = form
         viewer.send_form(form)
 
     def _enderchest_options(self, viewer: Player, target: Player):
         """Sub-menu for Ender Chest viewing options"""
-        tname = player_name(target)
-        form = ActionForm(
-            title=f"§l{tname}'s Ender Chest",
-            content="Choose how to view:\n\n§eActions§r - Take/Copy/Remove items\n§bView Only§r - Visual chest display"
-        )
-        form.add_button("§eActions (List View)")  # 0
-
-        if CHEST_FORM_AVAILABLE:
-            form.add_button("§bView Only (Visual Chest)")  # 1
-            form.add_button("« Back")                      # 2
-        else:
-            form.add_button("« Back")                      # 1
+        key = (target.xuid, "ender")
+        form = self._forms.get(key)
+        if form is None:
+            tname = player_name(target)
+            form = ActionForm(
+                title=f"§l{tname}'s Ender Chest",
+                content="Choose how to view:\n\n§eActions§r - Take/Copy/Remove items\n§bView Only§r - Visual chest display"
+            )
+            form.add_button("§eActions (List View)")  # BTN_VIEW_LIST
+            if self._chest_form_available:
+                form.add_button("§bView Only (Visual Chest)")  # BTN_VIEW_CHEST
+            form.add_button("« Back")
 
-        def pick(pl, idx):
-            if idx == 0:
-                return self._open_container(pl, target, which="ender")
-            elif idx == 1:
-                if CHEST_FORM_AVAILABLE:
+            def pick(pl, idx):
+                if idx == BTN_VIEW_LIST:
+                    return self._open_container(pl, target, which="ender")
+                elif self._chest_form_available and idx == BTN_VIEW_CHEST:
                     return self._show_chest_form(pl, target, which="ender")
                 else:
                     return self._inspect_online_player(pl, target)
-            else:
-                return self._inspect_online_player(pl, target)
 
-        form.on_submit = pick
+            form.on_submit = pick
+            self._forms[key] = form
         viewer.send_form(form)
 
     def _open_container(self, viewer: Player, target: Player, which: str):
         tname = player_name(target)
-        if which == "inv":
-            inv = get_inventory(target)
-            title = "Inventory"
-        else:
-            inv = get_ender(target)
-            title = "Ender Chest"
+        inv = self._container(target, which)
+        title = "Inventory" if which == "inv" else "Ender Chest"
 
         if not inv:
             viewer.send_message(f"§cCan't read {title.lower()} on this build.")
@@ -391,15 +668,15 @@ class InventoryManagerPlugin(Plugin):
 
         size = inv_size(inv)
         form = ActionForm(title=f"{title}: {tname}", content=f"{size} slots")
-        for i in range(size):
-            it = get_item_from_slot(inv, i)
-            if not it or is_air(it):
-                form.add_button(f"[{i}] — empty —")
-            else:
-                name = item_display_name(it)
-                cnt  = getattr(it, "amount", None) or getattr(it, "count", None) or 1
-                form.add_button(f"[{i}] {name} ×{cnt}")
-        form.add_button("« Back to Player")  # idx == size
+        _is_air, _name, _amount = is_air, item_display_name, item_amount
+        labels = [
+            f"[{i}] — empty —" if not it or _is_air(it) else f"[{i}] {_name(it)} ×{_amount(it)}"
+            for i, it in enumerate(get_contents(inv, size))
+        ]
+        labels.append("« Back to Player")  # idx == size
+        add_button = form.add_button
+        for label in labels:
+            add_button(label)
 
         def pick(pl, idx):
             if idx == size:
@@ -411,54 +688,42 @@ class InventoryManagerPlugin(Plugin):
         viewer.send_form(form)
 
     def _slot_actions(self, viewer: Player, target: Player, inv, slot_idx: int, title: str):
+        which = "inv" if title == "Inventory" else "ender"
         it = get_item_from_slot(inv, slot_idx)
         if not it or is_air(it):
             viewer.send_message("§7That slot is empty.")
-            return self._open_container(viewer, target, "inv" if title == "Inventory" else "ender")
+            return self._open_container(viewer, target, which)
 
         name = item_display_name(it)
-        cnt  = getattr(it, "amount", None) or getattr(it, "count", None) or 1
+        cnt  = item_amount(it)
 
         f = ActionForm(title=f"{title} [{slot_idx}]", content=f"§l{name}§r ×{cnt}")
-        f.add_button("Take")                # 0
-        f.add_button("Copy to me")          # 1
-        f.add_button("Remove (clear slot)") # 2
-        f.add_button("Back to slots")       # 3
-        f.add_button("Back to player")      # 4
+        f.add_button("Take")                # BTN_SLOT_TAKE
+        f.add_button("Copy to me")          # BTN_SLOT_COPY
+        f.add_button("Remove (clear slot)") # BTN_SLOT_REMOVE
+        f.add_button("Back to slots")       # BTN_SLOT_BACK
+        f.add_button("Back to player")      # BTN_SLOT_PLAYER
 
         def on_pick(pl, btn_idx):
-            if btn_idx == 0:  # Take
-                dst = get_inventory(pl)
+            if btn_idx == BTN_SLOT_TAKE or btn_idx == BTN_SLOT_COPY:
+                dst = self._container(pl, "inv")
                 if not dst:
                     pl.send_message("§cCan't access your inventory.")
-                    return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
+                    return self._open_container(pl, target, which)
                 item_now = get_item_from_slot(inv, slot_idx)
                 if not item_now or is_air(item_now):
                     pl.send_message("§7Item no longer there.")
-                    return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
-                if add_item(dst, item_now):
+                    return self._open_container(pl, target, which)
+                if not add_item(dst, item_now):
+                    pl.send_message("§cYour inventory is full.")
+                elif btn_idx == BTN_SLOT_TAKE:
                     set_item_in_slot(inv, slot_idx, None)
                     pl.send_message("§aItem moved to your inventory.")
                 else:
-                    pl.send_message("§cYour inventory is full.")
-                return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
-
-            if btn_idx == 1:  # Copy
-                dst = get_inventory(pl)
-                if not dst:
-                    pl.send_message("§cCan't access your inventory.")
-                    return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
-                item_now = get_item_from_slot(inv, slot_idx)
-                if not item_now or is_air(item_now):
-                    pl.send_message("§7Item no longer there.")
-                    return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
-                if add_item(dst, item_now):
                     pl.send_message("§aA copy was added to your inventory.")
-                else:
-                    pl.send_message("§cYour inventory is full.")
-                return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
+                return self._open_container(pl, target, which)
 
-            if btn_idx == 2:  # Remove
+            if btn_idx == BTN_SLOT_REMOVE:
                 item_now = get_item_from_slot(inv, slot_idx)
                 if not item_now or is_air(item_now):
                     pl.send_message("§7Nothing to remove.")
@@ -467,37 +732,41 @@ class InventoryManagerPlugin(Plugin):
                         pl.send_message("§aSlot cleared.")
                     else:
                         pl.send_message("§cFailed to clear that slot on this build.")
-                return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
+                return self._open_container(pl, target, which)
 
-            if btn_idx == 3:
-                return self._open_container(pl, target, "inv" if title == "Inventory" else "ender")
-            if btn_idx == 4:
+            if btn_idx == BTN_SLOT_BACK:
+                return self._open_container(pl, target, which)
+            if btn_idx == BTN_SLOT_PLAYER:
                 return self._inspect_online_player(pl, target)
         f.on_submit = on_pick
         viewer.send_form(f)
 
     def _show_chest_form(self, viewer: Player, target: Player, which: str):
         """Display inventory or ender chest using visual ChestForm (READ-ONLY view)"""
-        if not CHEST_FORM_AVAILABLE:
+        if not self._chest_form_available:
             viewer.send_message("§cChest form display is not available.")
             return self._inspect_online_player(viewer, target)
 
         tname = player_name(target)
+        inv = self._container(target, which)
         if which == "inv":
-            inv = get_inventory(target)
             title = f"{tname}'s Inventory (View Only)"
             allow_armor = True
         else:
-            inv = get_ender(target)
             title = f"{tname}'s Ender Chest (View Only)"
             allow_armor = False
 
         if not inv:
-            viewer.send_message(f"§cCan't read inventory on this build.")
+            viewer.send_message("§cCan't read inventory on this build.")
             return self._inspect_online_player(viewer, target)
 
         # Create chest form (read-only - no callback to prevent interactions)
-        chest = ChestForm(self, title, allow_armor)
+        try:
+            chest = ChestForm(self, title, allow_armor)
+        except Exception as e:
+            self.logger.error(f"Error creating chest form for {title}: {e}")
+            viewer.send_message(f"§cFailed to display {title}.")
+            return self._inspect_online_player(viewer, target)
 
         # DO NOT set any callback - this prevents the ItemStack callable error
         # The chest will be view-only by default without a callback
@@ -505,28 +774,22 @@ class InventoryManagerPlugin(Plugin):
         # Populate chest with items using full ItemStack to preserve NBT
         size = inv_size(inv)
 
-        # For ender chest, we need to handle the slot mapping differently
-        if which == "ender":
-            # Ender chest: Direct mapping (slot 0 -> chest slot 0)
-            # Using PrimeBDS approach - no pre-fill needed
-            try:
-                for slot_idx in range(min(size, 27)):
-                    item = get_item_from_slot(inv, slot_idx)
-                    if item and not is_air(item):
-                        # Direct mapping - no offset needed
-                        self._add_item_to_chest(chest, item, slot_idx)
-            except Exception as e:
-                self.logger.warning(f"Error reading ender chest: {e}")
-        else:
-            # Player inventory: Map to chest positions
-            # Using PrimeBDS approach - no pre-fill needed
-            for slot_idx in range(size):
-                item = get_item_from_slot(inv, slot_idx)
-                if item and not is_air(item):
-                    # Map slot to chest position
-                    chest_slot = self._map_slot_to_chest(slot_idx, which)
-                    if chest_slot is not None:
-                        self._add_item_to_chest(chest, item, chest_slot)
+        # Map slots to chest positions (precomputed, -1 = not shown)
+        # Using PrimeBDS approach - no pre-fill needed
+        mapping = ENDER_TO_CHEST if which == "ender" else INV_TO_CHEST
+        occupied = []
+        try:
+            # One pass: batch-read the slots and keep only mapped, non-air ones
+            for slot_idx, item in enumerate(get_contents(inv, min(size, len(mapping)))):
+                chest_slot = mapping[slot_idx]
+                if chest_slot >= 0 and item and not is_air(item):
+                    occupied.append((chest_slot, item))
+        except Exception as e:
+            self.logger.warning(f"Error reading {title}: {e}")
+
+        # Only occupied slots reach ChestForm; an empty container is sent as is
+        for chest_slot, item in occupied:
+            self._add_item_to_chest(chest, item, chest_slot)
 
         # Send chest form to viewer
         chest.send_to(viewer)
@@ -537,28 +800,23 @@ class InventoryManagerPlugin(Plugin):
     def _add_item_to_chest(self, chest, item, chest_slot: int):
         """Add an item to the chest form with full NBT data"""
         try:
-            item_type = str(item.type) if hasattr(item, 'type') else "minecraft:barrier"
-            item_amount = getattr(item, 'amount', 1)
+            item_type = getattr(item, 'type', None)
+            item_type = str(item_type) if item_type is not None else UNKNOWN_ITEM_TYPE
+            amount = getattr(item, 'amount', 1)
             item_data = getattr(item, 'data', 0)
 
-            # Extract metadata for display
-            display_name = ""
-            lore = []
-            enchants = None
-
-            if hasattr(item, 'item_meta') and item.item_meta:
-                meta = item.item_meta
-                if hasattr(meta, 'display_name') and meta.display_name:
-                    display_name = meta.display_name
-                if hasattr(meta, 'lore') and meta.lore:
-                    lore = meta.lore if isinstance(meta.lore, list) else [meta.lore]
-                if hasattr(meta, 'enchants') and meta.enchants:
-                    enchants = meta.enchants
+            # Extract metadata for display - one lookup per attribute
+            meta = getattr(item, 'item_meta', None)
+            if meta:
+                display_name = getattr(meta, 'display_name', None) or ""
+                lore = getattr(meta, 'lore', None)
+                enchants = getattr(meta, 'enchants', None) or None
+            else:
+                display_name, lore, enchants = "", None, None
+            lore = (list(lore) if isinstance(lore, list) else [lore]) if lore else []
 
             # Add enchantment info to lore if present
             if enchants and isinstance(enchants, dict):
-                if not lore:
-                    lore = []
                 for ench_name, ench_level in enchants.items():
                     lore.append(f"§9{ench_name} {ench_level}")
 
@@ -566,9 +824,7 @@ class InventoryManagerPlugin(Plugin):
             if "shulker" in item_type.lower():
                 # Try to get shulker contents from NBT
                 try:
-                    if hasattr(item, 'nbt') and item.nbt:
-                        if not lore:
-                            lore = []
+                    if getattr(item, 'nbt', None):
                         lore.append("§7(Contains items)")
                 except:
                     pass
@@ -580,7 +836,7 @@ class InventoryManagerPlugin(Plugin):
                 chest_slot,
                 item_type,
                 None,  # Don't pass ItemStack directly - causes callable error
-                item_amount=item_amount,
+                item_amount=amount,
                 item_data=item_data,
                 display_name=display_name,
                 lore=lore if lore else None,
@@ -589,31 +845,16 @@ class InventoryManagerPlugin(Plugin):
         except Exception as e:
             self.logger.warning(f"Failed to add item to chest slot {chest_slot}: {e}")
 
-    def _map_slot_to_chest(self, slot_idx: int, which: str) -> int:
-        """Map inventory slot index to chest form slot"""
-        if which == "ender":
-            # Ender chest: direct mapping (0-26)
-            return slot_idx
-        else:
-            # Player inventory: map main inventory slots (9-35) to chest slots (0-26)
-            # and hotbar (0-8) to chest slots (27-35)
-            if 9 <= slot_idx <= 35:
-                return slot_idx - 9  # Main inventory
-            elif 0 <= slot_idx <= 8:
-                return 27 + slot_idx  # Hotbar
-            else:
-                return None  # Armor/offhand slots - handled separately by allow_armor
-
     # ──────────────────────────────────────────────────────────────────────
     # OFFLINE PLAYER ENDER CHEST VIEWING
     # ──────────────────────────────────────────────────────────────────────
     def _pick_offline_player(self, viewer: Player):
         """Show text input to search for offline player"""
-        if not RAPIDNBT_AVAILABLE:
+        if not self._rapidnbt_available:
             viewer.send_message("§cRapidNBT is not available. Cannot view offline player data.")
             return self.open(viewer)
 
-        if not CHEST_FORM_AVAILABLE:
+        if not self._chest_form_available:
             viewer.send_message("§cChestForm is not available. Cannot display offline ender chests.")
             return self.open(viewer)
 
@@ -671,7 +912,7 @@ class InventoryManagerPlugin(Plugin):
                 self.logger.error(f"Database search failed: {e}, falling back to NBT")
 
         # Fallback to NBT file reading (for players who haven't joined since database was added)
-        if not RAPIDNBT_AVAILABLE:
+        if not self._rapidnbt_available:
             viewer.send_message(f"§cNo player found matching '{search_name}' in database.")
             viewer.send_message("§7Note: Players must join at least once for offline viewing.")
             return self._pick_offline_player(viewer)
@@ -702,27 +943,15 @@ class InventoryManagerPlugin(Plugin):
 
     def _find_offline_player_nbt(self, viewer: Player, search_name: str):
         """Find offline player by name using NBT files (fallback method)"""
-        # Get world folder path - try common Bedrock server locations
-        possible_paths = [
-            Path("worlds") / "Bedrock level" / "players",  # Default Bedrock world
-            Path("worlds") / "world" / "players",           # Alternative name
-            Path("Bedrock level") / "players",              # Direct path
-            Path("world") / "players",                      # Direct alternative
-        ]
+        player_data_path = self._resolve_player_data_path()
 
-        player_data_path = None
-        for path in possible_paths:
-            if path.exists():
-                player_data_path = path
-                break
-
-        if not player_data_path or not player_data_path.exists():
+        if not player_data_path:
             viewer.send_message("§cPlayer data folder not found.")
             viewer.send_message("§7Tried: worlds/Bedrock level/players, worlds/world/players")
             return self.open(viewer)
 
         # Get list of player files
-        player_files = list(player_data_path.glob("*.dat"))
+        player_files = self._list_player_files(player_data_path)
 
         if not player_files:
             viewer.send_message("§cNo offline player data found.")
@@ -732,24 +961,16 @@ class InventoryManagerPlugin(Plugin):
         search_lower = search_name.lower()
         matches = []
 
-        for player_file in player_files:
-            # Try to read player name from NBT data
-            try:
-                nbt_data = RapidNBT.read_nbt(str(player_file))
-                player_name = nbt_data.get("PlayerName", player_file.stem)
-                if not player_name or player_name == "":
-                    player_name = player_file.stem
-
-                # Check if name matches (case-insensitive, preserves spaces)
-                if search_lower in player_name.lower():
-                    matches.append((player_name, player_file))
-
-            except Exception as e:
+        for (player_file, stem), (player_name, error) in zip(
+            player_files, self._nbt_pool.map(self._read_player_name, player_files)
+        ):
+            if error is not None:
                 # Fallback to filename if NBT read fails
-                self.logger.warning(f"Failed to read player name from {player_file}: {e}")
-                player_name = player_file.stem
-                if search_lower in player_name.lower():
-                    matches.append((player_name, player_file))
+                self.logger.warning(f"Failed to read player name from {player_file}: {error}")
+
+            # Check if name matches (case-insensitive, preserves spaces)
+            if search_lower in player_name.lower():
+                matches.append((player_name, player_file))
 
         if not matches:
             viewer.send_message(f"§cNo offline player found matching '{search_name}'")
@@ -771,38 +992,127 @@ class InventoryManagerPlugin(Plugin):
 
         form.add_button("« Search Again")
 
+        # The search just parsed every file, so matches are cache hits unless it overflowed the NBT cache
+        prefetch = len(player_files) > NBT_CACHE_SIZE
+        if prefetch:
+            # Early matches may have been pushed out; warm the top of the list
+            self._prefetch_nbt(player_file for _, player_file in matches[:PREFETCH_NEIGHBOURS + 1])
+
         def on_submit(pl, idx):
             if idx is None or idx >= len(matches):
                 return self._pick_offline_player(pl)
 
+            if prefetch:
+                # Viewers tend to go back and try the next match - keep the neighbours warm too
+                self._prefetch_nbt(
+                    matches[i][1]
+                    for i in range(max(0, idx - PREFETCH_NEIGHBOURS), min(len(matches), idx + PREFETCH_NEIGHBOURS + 1))
+                    if i != idx
+                )
             player_name, player_file = matches[idx]
             return self._show_offline_enderchest_nbt(pl, player_name, player_file)
 
         form.on_submit = on_submit
         viewer.send_form(form)
 
+    def _prefetch_nbt(self, player_files):
+        """Parse player files on the NBT pool so a later view is a cache hit"""
+        if not self._nbt_pool:
+            return
+        for player_file in player_files:
+            self._nbt_pool.submit(self._read_nbt_cached, player_file)
+
+    def _read_player_name(self, file_entry: tuple) -> tuple:
+        """Read a player's name from their .dat file: (name, error), falling back to the file name"""
+        player_file, stem = file_entry
+        try:
+            nbt_data = self._read_nbt_cached(player_file)
+        except Exception as e:
+            return stem, e
+        player_name = nbt_data.get("PlayerName")
+        return (player_name if isinstance(player_name, str) and player_name else stem), None
+
+    def _resolve_player_data_path(self):
+        """Get the players folder - try common Bedrock server locations"""
+        path = self._player_data_path
+        if path and path.exists():
+            return path
+
+        for path in PLAYER_DATA_PATHS:
+            if path.exists():
+                self._player_data_path = path
+                return path
+        return None
+
+    def _discover_offline_players(self):
+        """Resolve the players folder and list its files in the background"""
+        try:
+            player_data_path = self._resolve_player_data_path()
+            if player_data_path:
+                self._list_player_files(player_data_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to scan offline player data: {e}")
+
+    def _list_player_files(self, player_data_path: Path) -> list:
+        """List (path, stem) of every .dat file in the players folder, cached until the folder changes"""
+        mtime = os.stat(player_data_path).st_mtime_ns
+        cache = self._offline_cache
+        if cache and cache[0] == player_data_path and cache[1] == mtime:
+            return cache[2]
+
+        with os.scandir(player_data_path) as entries:
+            player_files = [
+                (Path(entry.path), entry.name[:-4])
+                for entry in entries
+                if entry.name.endswith(".dat") and entry.is_file()
+            ]
+        self._offline_cache = (player_data_path, mtime, player_files)
+        return player_files
+
+    def _offline_ender(self, player_file: Path) -> tuple:
+        """(entries sorted by slot, slot -> entry) for a player file's ender chest, rebuilt only when the file changes"""
+        nbt_data = self._read_nbt_cached(player_file)
+        hit = self._ender_entries_cache.get(player_file)
+        if hit and hit[0] is nbt_data:
+            return hit[1], hit[2]
+
+        entries = ender_entries(nbt_data.get("EnderChestInventory", []))
+        by_slot = {entry[0]: entry for entry in entries}
+        if len(self._ender_entries_cache) >= NBT_CACHE_SIZE:
+            # Evict the oldest entry
+            del self._ender_entries_cache[next(iter(self._ender_entries_cache))]
+        # ChestForm records are filled in by _offline_chest_records on the first visual view
+        self._ender_entries_cache[player_file] = [nbt_data, entries, by_slot, None]
+        return entries, by_slot
+
+    def _offline_chest_records(self, player_file: Path) -> list:
+        """ChestForm records for a player file's ender chest, built once per change of the file"""
+        entries, _ = self._offline_ender(player_file)
+        cached = self._ender_entries_cache[player_file]
+        if cached[3] is None:
+            cached[3] = ender_chest_records(entries)
+        return cached[3]
+
+    def _read_nbt_cached(self, player_file: Path) -> dict:
+        """Read the parts of a player .dat file the offline views use, cached while the file is unchanged"""
+        return read_player_nbt(str(player_file), player_file.stat().st_mtime_ns)
+
     def _show_offline_enderchest_from_db(self, viewer: Player, user):
         """Display offline player's ender chest from database - choose between visual or actions"""
         form = ActionForm(
             title=f"§l{user.name}'s Ender Chest (Offline - Database)",
             content="Choose how to view:\n\n§eActions§r - Copy items to your inventory\n§bView Only§r - Visual chest display"
         )
-        form.add_button("§eActions (List View)")  # 0
-
-        if CHEST_FORM_AVAILABLE:
-            form.add_button("§bView Only (Visual Chest)")  # 1
-            form.add_button("« Back")                      # 2
-        else:
-            form.add_button("« Back")                      # 1
+        form.add_button("§eActions (List View)")  # BTN_VIEW_LIST
+        if self._chest_form_available:
+            form.add_button("§bView Only (Visual Chest)")  # BTN_VIEW_CHEST
+        form.add_button("« Back")
 
         def pick(pl, idx):
-            if idx == 0:
+            if idx == BTN_VIEW_LIST:
                 return self._show_offline_enderchest_list_db(pl, user)
-            elif idx == 1:
-                if CHEST_FORM_AVAILABLE:
-                    return self._show_offline_enderchest_visual_db(pl, user)
-                else:
-                    return self._pick_offline_player(pl)
+            elif self._chest_form_available and idx == BTN_VIEW_CHEST:
+                return self._show_offline_enderchest_visual_db(pl, user)
             else:
                 return self._pick_offline_player(pl)
 
@@ -815,22 +1125,16 @@ class InventoryManagerPlugin(Plugin):
             title=f"§l{player_name}'s Ender Chest (Offline - NBT)",
             content="Choose how to view:\n\n§eActions§r - Copy items to your inventory\n§bView Only§r - Visual chest display"
         )
-        form.add_button("§eActions (List View)")  # 0
-
-        if CHEST_FORM_AVAILABLE:
-            form.add_button("§bView Only (Visual Chest)")  # 1
-            form.add_button("« Back")                      # 2
-        else:
-            form.add_button("« Back")                      # 1
+        form.add_button("§eActions (List View)")  # BTN_VIEW_LIST
+        if self._chest_form_available:
+            form.add_button("§bView Only (Visual Chest)")  # BTN_VIEW_CHEST
+        form.add_button("« Back")
 
         def pick(pl, idx):
-            if idx == 0:
+            if idx == BTN_VIEW_LIST:
                 return self._show_offline_enderchest_list_nbt(pl, player_name, player_file)
-            elif idx == 1:
-                if CHEST_FORM_AVAILABLE:
-                    return self._show_offline_enderchest_visual_nbt(pl, player_name, player_file)
-                else:
-                    return self._pick_offline_player(pl)
+            elif self._chest_form_available and idx == BTN_VIEW_CHEST:
+                return self._show_offline_enderchest_visual_nbt(pl, player_name, player_file)
             else:
                 return self._pick_offline_player(pl)
 
@@ -841,7 +1145,7 @@ class InventoryManagerPlugin(Plugin):
     # DATABASE-BASED OFFLINE ENDER CHEST VIEWING
     # ──────────────────────────────────────────────────────────────────────
 
-    def _show_offline_enderchest_list_db(self, viewer: Player, user):
+    def _show_offline_enderchest_list_db(self, viewer: Player, user, status: str = None):
         """Show offline ender chest as list with copy actions (from database)"""
         try:
             # Get ender chest data from database
@@ -854,7 +1158,8 @@ class InventoryManagerPlugin(Plugin):
             # Create list form
             form = ActionForm(
                 title=f"§l{user.name}'s Ender Chest (Offline - DB)",
-                content="§7Click an item to copy it to your inventory"
+                content=f"{status}\n\n§7Click an item to copy it to your inventory" if status
+                else "§7Click an item to copy it to your inventory"
             )
 
             # Sort by slot
@@ -862,7 +1167,7 @@ class InventoryManagerPlugin(Plugin):
 
             for item_data in ender_items:
                 slot = item_data.get("slot", -1)
-                item_type = item_data.get("type", "minecraft:barrier")
+                item_type = item_data.get("type", UNKNOWN_ITEM_TYPE)
                 item_count = item_data.get("amount", 1)
                 display_name = item_data.get("display_name", "")
 
@@ -889,7 +1194,7 @@ class InventoryManagerPlugin(Plugin):
 
     def _show_offline_enderchest_visual_db(self, viewer: Player, user):
         """Display offline player's ender chest using ChestForm (read-only, from database)"""
-        if not CHEST_FORM_AVAILABLE:
+        if not self._chest_form_available:
             viewer.send_message("§cChestForm is not available.")
             return self._show_offline_enderchest_from_db(viewer, user)
 
@@ -897,16 +1202,20 @@ class InventoryManagerPlugin(Plugin):
             # Get ender chest data from database
             ender_items = self.db.get_enderchest(user.xuid)
 
+            if not any(0 <= item_data.get("slot", -1) <= 26 for item_data in ender_items):
+                viewer.send_message(f"§c{user.name}'s ender chest is empty or data not found.")
+                return self._show_offline_enderchest_from_db(viewer, user)
+
             # Create chest form
             chest = ChestForm(self, f"{user.name}'s Ender Chest (Offline - DB - View Only)", False)
 
             # Populate chest with items from database
             for item_data in ender_items:
                 slot = item_data.get("slot", -1)
-                if slot < 0 or slot > 26:
+                if not 0 <= slot <= 26:
                     continue
 
-                item_type = item_data.get("type", "minecraft:barrier")
+                item_type = item_data.get("type", UNKNOWN_ITEM_TYPE)
                 item_count = item_data.get("amount", 1)
                 item_damage = item_data.get("damage", 0)
                 display_name = item_data.get("display_name", "")
@@ -941,7 +1250,7 @@ class InventoryManagerPlugin(Plugin):
 
     def _offline_item_actions_db(self, viewer: Player, user, item_data: dict):
         """Show actions for an offline ender chest item (from database)"""
-        item_type = item_data.get("type", "minecraft:barrier")
+        item_type = item_data.get("type", UNKNOWN_ITEM_TYPE)
         item_count = item_data.get("amount", 1)
         display_name = item_data.get("display_name", "")
 
@@ -951,11 +1260,11 @@ class InventoryManagerPlugin(Plugin):
             title=f"§l{name}",
             content=f"§7Type: §f{item_type}\n§7Amount: §f{item_count}\n\n§eWhat would you like to do?"
         )
-        form.add_button("§aCopy to My Inventory")
+        form.add_button("§aCopy to My Inventory")  # BTN_OFFLINE_COPY
         form.add_button("« Back")
 
         def on_action(pl, idx):
-            if idx == 0:
+            if idx == BTN_OFFLINE_COPY:
                 # Copy item
                 return self._copy_offline_item_db(pl, user, item_data)
             else:
@@ -967,9 +1276,7 @@ class InventoryManagerPlugin(Plugin):
     def _copy_offline_item_db(self, viewer: Player, user, item_data: dict):
         """Copy an offline ender chest item to viewer's inventory (from database)"""
         try:
-            from endstone.inventory import ItemStack
-
-            item_type = item_data.get("type", "minecraft:barrier")
+            item_type = item_data.get("type", UNKNOWN_ITEM_TYPE)
             item_count = item_data.get("amount", 1)
             item_damage = item_data.get("damage", 0)
             display_name = item_data.get("display_name", "")
@@ -999,10 +1306,11 @@ class InventoryManagerPlugin(Plugin):
             # Add to viewer's inventory
             viewer.inventory.add_item(item)
 
+            # Report the result in the refreshed list instead of a separate chat message
             name = display_name if display_name else item_type.replace("minecraft:", "")
-            viewer.send_message(f"§aCopied §f{name} ×{item_count} §ato your inventory!")
-
-            return self._show_offline_enderchest_list_db(viewer, user)
+            return self._show_offline_enderchest_list_db(
+                viewer, user, status=f"§aCopied §f{name} ×{item_count} §ato your inventory!"
+            )
 
         except Exception as e:
             self.logger.error(f"Failed to copy offline item: {e}")
@@ -1013,51 +1321,25 @@ class InventoryManagerPlugin(Plugin):
     # NBT-BASED OFFLINE ENDER CHEST VIEWING (FALLBACK)
     # ──────────────────────────────────────────────────────────────────────
 
-    def _show_offline_enderchest_list_nbt(self, viewer: Player, player_name: str, player_file: Path):
+    def _show_offline_enderchest_list_nbt(self, viewer: Player, player_name: str, player_file: Path, status: str = None):
         """Show offline ender chest as list with copy actions (from NBT file)"""
         try:
-            # Read player NBT data
-            nbt_data = RapidNBT.read_nbt(str(player_file))
-
-            # Get ender chest inventory from NBT
-            ender_items = nbt_data.get("EnderChestInventory", [])
+            # Read player NBT data (cached) as flattened ender chest entries
+            item_list, _ = self._offline_ender(player_file)
 
-            if not ender_items:
+            if not item_list:
                 viewer.send_message(f"§c{player_name}'s ender chest is empty or data not found.")
                 return self._show_offline_enderchest_nbt(viewer, player_name, player_file)
 
             # Create list form
             form = ActionForm(
                 title=f"§l{player_name}'s Ender Chest (Offline)",
-                content="§7Click an item to copy it to your inventory"
+                content=f"{status}\n\n§7Click an item to copy it to your inventory" if status
+                else "§7Click an item to copy it to your inventory"
             )
 
-            # Store items for later access
-            item_list = []
-
-            for item_data in ender_items:
-                if not isinstance(item_data, dict):
-                    continue
-
-                slot = item_data.get("Slot", -1)
-                if slot < 0 or slot > 26:
-                    continue
-
-                item_type = item_data.get("Name", "minecraft:barrier")
-                item_count = item_data.get("Count", 1)
-
-                # Get display name
-                display_name = ""
-                tag = item_data.get("tag", {})
-                if isinstance(tag, dict):
-                    display = tag.get("display", {})
-                    if isinstance(display, dict):
-                        display_name = display.get("Name", "")
-
-                # Create button text
-                name = display_name if display_name else item_type.replace("minecraft:", "")
+            for slot, _, item_count, name, _ in item_list:
                 form.add_button(f"[{slot}] {name} ×{item_count}")
-                item_list.append(item_data)
 
             form.add_button("« Back")
 
@@ -1065,8 +1347,7 @@ class InventoryManagerPlugin(Plugin):
                 if idx is None or idx >= len(item_list):
                     return self._show_offline_enderchest_nbt(pl, player_name, player_file)
 
-                selected_item = item_list[idx]
-                return self._offline_item_actions_nbt(pl, player_name, player_file, selected_item)
+                return self._offline_item_actions_nbt(pl, player_name, player_file, item_list[idx])
 
             form.on_submit = on_select
             viewer.send_form(form)
@@ -1076,46 +1357,37 @@ class InventoryManagerPlugin(Plugin):
             viewer.send_message(f"§cFailed to load {player_name}'s ender chest data.")
             return self._pick_offline_player(viewer)
 
-    def _offline_item_actions_nbt(self, viewer: Player, player_name: str, player_file: Path, item_data: dict):
+    def _offline_item_actions_nbt(self, viewer: Player, player_name: str, player_file: Path, entry: tuple):
         """Show actions for an offline ender chest item (from NBT file)"""
-        slot = item_data.get("Slot", -1)
-        item_type = item_data.get("Name", "minecraft:barrier")
-        item_count = item_data.get("Count", 1)
-
-        # Get display name
-        display_name = ""
-        tag = item_data.get("tag", {})
-        if isinstance(tag, dict):
-            display = tag.get("display", {})
-            if isinstance(display, dict):
-                display_name = display.get("Name", "")
-
-        name = display_name if display_name else item_type.replace("minecraft:", "")
+        slot, item_type, item_count, name, _ = entry
 
         form = ActionForm(
             title=f"§lSlot {slot}",
             content=f"§e{name} §7×{item_count}\n\n§7Choose an action:"
         )
-        form.add_button("§bCopy to My Inventory")  # 0
-        form.add_button("« Back to List")          # 1
+        form.add_button("§bCopy to My Inventory")  # BTN_OFFLINE_COPY
+        form.add_button("« Back to List")
 
         def on_action(pl, idx):
-            if idx == 0:
+            if idx == BTN_OFFLINE_COPY:
                 # Copy item to viewer's inventory
-                return self._copy_offline_item_nbt(pl, player_name, player_file, item_data)
+                return self._copy_offline_item_nbt(pl, player_name, player_file, slot)
             else:
                 return self._show_offline_enderchest_list_nbt(pl, player_name, player_file)
 
         form.on_submit = on_action
         viewer.send_form(form)
 
-    def _copy_offline_item_nbt(self, viewer: Player, player_name: str, player_file: Path, item_data: dict):
+    def _copy_offline_item_nbt(self, viewer: Player, player_name: str, player_file: Path, slot: int):
         """Copy an offline ender chest item to viewer's inventory using RapidNBT (from NBT file)"""
         try:
-            from endstone.inventory import ItemStack
-
-            item_type = item_data.get("Name", "minecraft:barrier")
-            item_count = item_data.get("Count", 1)
+            # Look the slot up in the current (cached) file contents
+            _, by_slot = self._offline_ender(player_file)
+            entry = by_slot.get(slot)
+            if entry is None:
+                viewer.send_message("§7Item no longer there.")
+                return self._show_offline_enderchest_list_nbt(viewer, player_name, player_file)
+            _, item_type, item_count, _, item_data = entry
             item_damage = item_data.get("Damage", 0)
 
             # Create ItemStack
@@ -1123,36 +1395,36 @@ class InventoryManagerPlugin(Plugin):
 
             # Try to apply NBT data to the item
             tag = item_data.get("tag", {})
-            if isinstance(tag, dict) and tag:
+            if self._has_item_meta and isinstance(tag, dict) and tag:
                 # Apply display name and lore if available
-                if hasattr(item, 'item_meta') and item.item_meta:
-                    meta = item.item_meta
-
+                meta = item.item_meta
+                if meta:
                     display = tag.get("display", {})
                     if isinstance(display, dict):
                         display_name = display.get("Name", "")
-                        if display_name and hasattr(meta, 'display_name'):
+                        if display_name and self._meta_has_display_name:
                             meta.display_name = display_name
 
                         lore_data = display.get("Lore", [])
-                        if lore_data and hasattr(meta, 'lore'):
+                        if lore_data and self._meta_has_lore:
                             meta.lore = lore_data if isinstance(lore_data, list) else [lore_data]
 
                     # Note: Enchantments might not be directly settable via item_meta
                     # The NBT data is preserved in the ItemStack creation
 
             # Add to viewer's inventory
-            viewer_inv = get_inventory(viewer)
+            viewer_inv = self._container(viewer, "inv")
             if not viewer_inv:
                 viewer.send_message("§cCan't access your inventory.")
                 return self._show_offline_enderchest_list_nbt(viewer, player_name, player_file)
 
+            # Report the result in the refreshed list instead of a separate chat message
             if add_item(viewer_inv, item):
-                viewer.send_message(f"§aCopied item to your inventory!")
+                status = MSG_COPIED
             else:
-                viewer.send_message("§cYour inventory is full.")
+                status = "§cYour inventory is full."
 
-            return self._show_offline_enderchest_list_nbt(viewer, player_name, player_file)
+            return self._show_offline_enderchest_list_nbt(viewer, player_name, player_file, status=status)
 
         except Exception as e:
             self.logger.error(f"Error copying offline item: {e}")
@@ -1162,68 +1434,23 @@ class InventoryManagerPlugin(Plugin):
     def _show_offline_enderchest_visual_nbt(self, viewer: Player, player_name: str, player_file: Path):
         """Display offline player's ender chest using ChestForm (read-only, from NBT file)"""
         try:
-            # Read player NBT data
-            nbt_data = RapidNBT.read_nbt(str(player_file))
+            # Read player NBT data (cached) as ChestForm records, already slot-checked
+            records = self._offline_chest_records(player_file)
 
-            # Get ender chest inventory from NBT
-            ender_items = nbt_data.get("EnderChestInventory", [])
-
-            if not ender_items:
+            if not records:
                 viewer.send_message(f"§c{player_name}'s ender chest is empty or data not found.")
                 return self._show_offline_enderchest_nbt(viewer, player_name, player_file)
 
             # Create chest form
             chest = ChestForm(self, f"{player_name}'s Ender Chest (Offline - View Only)", False)
 
-            # Populate chest with items from NBT (using PrimeBDS approach - no pre-fill needed)
-            for item_data in ender_items:
-                if not isinstance(item_data, dict):
-                    continue
-
-                slot = item_data.get("Slot", -1)
-                if slot < 0 or slot > 26:
-                    continue
-
-                item_type = item_data.get("Name", "minecraft:barrier")
-                item_count = item_data.get("Count", 1)
-                item_damage = item_data.get("Damage", 0)
-
-                # Extract display name and lore from tag
-                display_name = ""
-                lore = []
-                enchants = None
-
-                tag = item_data.get("tag", {})
-                if isinstance(tag, dict):
-                    display = tag.get("display", {})
-                    if isinstance(display, dict):
-                        display_name = display.get("Name", "")
-                        lore_data = display.get("Lore", [])
-                        if isinstance(lore_data, list):
-                            lore = lore_data
-
-                    # Get enchantments
-                    ench_data = tag.get("ench", [])
-                    if isinstance(ench_data, list) and ench_data:
-                        enchants = {}
-                        for ench in ench_data:
-                            if isinstance(ench, dict):
-                                ench_id = ench.get("id", 0)
-                                ench_lvl = ench.get("lvl", 1)
-                                enchants[f"Enchantment {ench_id}"] = ench_lvl
-
+            # Hand the prebuilt slot arguments to ChestForm in one tight loop
+            # (using PrimeBDS approach - no pre-fill needed)
+            set_slot = chest.set_slot
+            for slot, item_type, kwargs in records:
                 # Add item to chest - direct mapping (no offset)
                 try:
-                    chest.set_slot(
-                        slot,
-                        item_type,
-                        None,
-                        item_amount=item_count,
-                        item_data=item_damage,
-                        display_name=display_name,
-                        lore=lore if lore else None,
-                        enchants=enchants
-                    )
+                    set_slot(slot, item_type, None, **kwargs)
                 except Exception as e:
                     self.logger.warning(f"Failed to set offline ender chest slot {slot}: {e}")
 
@@ -1234,6 +1461,6 @@ class InventoryManagerPlugin(Plugin):
         except Exception as e:
             self.logger.error(f"Error reading offline player data for {player_name}: {e}")
             viewer.send_message(f"§cFailed to load {player_name}'s ender chest data.")
-            return self._show_offline_enderchest(viewer, player_name, player_file)
+            return self._show_offline_enderchest_nbt(viewer, player_name, player_file)
 
     #
\ No newline at end of file